@@ -0,0 +1,69 @@
+"""
+Single entry point for the analysis scripts.
+
+  python3 analysis/analyze.py clean
+  python3 analysis/analyze.py distributions [--data PATH] [--plots DIR]
+                                            [--cohort {stop_reason,vital_level}] [--jobs N]
+  python3 analysis/analyze.py regression [--data PATH] [--plots DIR]
+
+Only the module for the chosen subcommand is imported, and each module
+imports pandas/matplotlib/etc. inside its main(), so a run pays only for the
+libraries it actually uses. Paths default to the repo's data/ and
+analysis/plots/ regardless of the working directory.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# Headless before anything can pull in pyplot
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+COMMANDS = {
+    "clean": "clean_data",
+    "distributions": "distributions",
+    "regression": "regression",
+}
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Wikipedia Foundations analysis")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("clean", help="merge api_data.csv and hyperlink_data.csv into cleaned_data.csv")
+    for name, help_text in (("distributions", "vital_level / links_away tables and plots"),
+                            ("regression", "OLS, Mann-Whitney and mean vital level plot")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--data", default=None, help="cleaned_data.csv to read")
+        p.add_argument("--plots", default=None, help="directory to write outputs to")
+        if name == "distributions":
+            p.add_argument("--cohort", action="append", default=[], dest="cohorts",
+                           choices=importlib.import_module("distributions").COHORTS,
+                           help="also render every plot per value of this column (repeatable)")
+            p.add_argument("--jobs", type=_positive_int, default=None,
+                           help="rendering processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(COMMANDS[args.cmd])
+    kwargs = {}
+    if getattr(args, "data", None):
+        kwargs["data_path"] = args.data
+    if getattr(args, "plots", None):
+        kwargs["plots_dir"] = args.plots
+    if getattr(args, "cohorts", None):
+        kwargs["cohorts"] = args.cohorts
+    if getattr(args, "jobs", None) is not None:
+        kwargs["jobs"] = args.jobs
+    module.main(**kwargs)
+
+if __name__ == "__main__":
+    main()
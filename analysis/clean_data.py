@@ -1,17 +1,41 @@
 '''
 1. Cleans the data, fixes groups
 '''
-import pandas as pd
+import os
 
-api_data = pd.read_csv("../data/api_data.csv")
-hyperlink_data = pd.read_csv("../data/hyperlink_data.csv")
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, "..", "data")
+API_CSV = os.path.join(DATA_DIR, "api_data.csv")
+HYPERLINK_CSV = os.path.join(DATA_DIR, "hyperlink_data.csv")
+CLEANED_CSV = os.path.join(DATA_DIR, "cleaned_data.csv")
 
-api_data_filtered = api_data.drop(columns=["page_url", "run_id"])
-complete_runs = hyperlink_data[hyperlink_data["stop_reason"] == 'reached_philosophy']
+def merge_runs(api_data, runs):
+    """Attach api_data columns to hyperlink rows; missing API values become 0."""
+    api_data_filtered = api_data.drop(columns=["page_url", "run_id"])
+    merged = runs.merge(api_data_filtered, on="page_title", how="left")
+    merged_filled = merged.fillna(0)
+    merged_filled["created_ts"] = merged["created_ts"]
+    # links_away is "n/a" for runs that never reached Philosophy; keep it missing
+    merged_filled["links_away"] = merged["links_away"]
+    return merged_filled
 
-merged = complete_runs.merge(api_data_filtered, on="page_title", how="left")
-merged_filled = merged.fillna(0)
-merged_filled["created_ts"] = merged["created_ts"]
-merged_filled["page_title_normalized"] = merged_filled["page_title"].str.replace("Philosophical", "Philosophy", regex=False)
-merged_filled.drop(columns=["page_url"], inplace=True)
-merged_filled.to_csv("../data/cleaned_data.csv", index=False)
+def load_all_runs(api_csv: str = API_CSV, hyperlink_csv: str = HYPERLINK_CSV):
+    """Every run, whatever its stop_reason, merged with api_data."""
+    import pandas as pd
+    return merge_runs(pd.read_csv(api_csv), pd.read_csv(hyperlink_csv))
+
+def main(api_csv: str = API_CSV, hyperlink_csv: str = HYPERLINK_CSV, out_csv: str = CLEANED_CSV) -> None:
+    import pandas as pd
+
+    api_data = pd.read_csv(api_csv)
+    hyperlink_data = pd.read_csv(hyperlink_csv)
+
+    complete_runs = hyperlink_data[hyperlink_data["stop_reason"] == 'reached_philosophy']
+
+    merged_filled = merge_runs(api_data, complete_runs)
+    merged_filled["page_title_normalized"] = merged_filled["page_title"].str.replace("Philosophical", "Philosophy", regex=False)
+    merged_filled.drop(columns=["page_url"], inplace=True)
+    merged_filled.to_csv(out_csv, index=False)
+
+if __name__ == "__main__":
+    main()
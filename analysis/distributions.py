@@ -1,127 +1,211 @@
 """
 Distribution summaries for vital_level and links_away
 
-Outputs (saved under ../plots/):
+Outputs (saved under analysis/plots/):
   - vital_distribution.csv           # counts & proportions for rated pages
   - links_away_distribution.csv      # histogram table for steps
   - vital_hist.png                   # bar chart of vital level distribution
   - links_away_hist.png              # histogram of distance to Philosophy
   - vital_ecdf.png                   # ECDF for vital levels (step plot)
   - links_away_ecdf.png              # ECDF for distance
+  - <plot>_<cohort>_<value>.png      # same plots per cohort, when requested
 
 Notes:
   * Filters to rated pages for vital_level (>0), and keeps non-null links_away.
   * Also reports basic descriptive stats (count, mean, std, min, quartiles, max).
+  * pandas/seaborn/matplotlib are imported inside functions so importing this
+    module is cheap; rendering always uses the non-interactive Agg backend.
+  * The data is reduced once to value counts, and every figure is rendered
+    from those counts in its own worker process.
+  * cleaned_data.csv only holds runs that reached Philosophy, so the
+    stop_reason cohort is built from every run in hyperlink_data.csv merged
+    with api_data.csv. Only reached runs have a links_away, so the other
+    stop reasons get the vital plots alone.
+  * A cohort skips the plots of its own column (a vital_level cohort has no
+    vital_hist/vital_ecdf, which would be a single bar).
 """
 
 import os
-import numpy as np
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # -----------------
-# Config & loading
+# Config
 # -----------------
-HERE = os.path.dirname(__file__)
-DATA_PATH = os.path.join(HERE, "../data/cleaned_data.csv")
-PLOTS_DIR = os.path.join(HERE, "../plots")
-os.makedirs(PLOTS_DIR, exist_ok=True)
-
-# Load
-df = pd.read_csv(DATA_PATH)
-
-# Basic filters
-df_vital = df.loc[df["vital_level"].notna() & (df["vital_level"] > 0)].copy()
-df_links = df.loc[df["links_away"].notna()].copy()
-
-# Cast types
-df_vital["vital_level"] = df_vital["vital_level"].astype(int)
-df_links["links_away"] = df_links["links_away"].astype(int)
-
-# -------------------------------
-# 1) Vital distribution (table)
-# -------------------------------
-vit_counts = (
-    df_vital["vital_level"].value_counts().sort_index().rename("count").to_frame()
-)
-vit_counts["proportion"] = vit_counts["count"] / vit_counts["count"].sum()
-vit_counts.index.name = "vital_level"
-
-# Descriptive stats
-vit_desc = df_vital["vital_level"].describe().to_frame(name="vital_level")
-
-# Save table
-vit_counts.to_csv(os.path.join(PLOTS_DIR, "vital_distribution.csv"))
-vit_desc.to_csv(os.path.join(PLOTS_DIR, "vital_desc.csv"))
-
-# -------------------------------
-# 2) Links-away distribution (table)
-# -------------------------------
-# Histogram bins for steps: use each integer step as a bin
-step_counts = (
-    df_links["links_away"].value_counts().sort_index().rename("count").to_frame()
-)
-step_counts["proportion"] = step_counts["count"] / step_counts["count"].sum()
-step_counts.index.name = "links_away"
-
-links_desc = df_links["links_away"].describe().to_frame(name="links_away")
-
-# Save table
-step_counts.to_csv(os.path.join(PLOTS_DIR, "links_away_distribution.csv"))
-links_desc.to_csv(os.path.join(PLOTS_DIR, "links_away_desc.csv"))
-
-# -----------------
-# 3) Plots
-# -----------------
-sns.set_theme(style="whitegrid", context="talk")
-
-# Vital: bar chart (categorical levels 1–5)
-plt.figure(figsize=(8,5))
-ax = sns.barplot(x=vit_counts.index, y=vit_counts["count"].values)
-ax.set_xlabel("Vital Level")
-ax.set_ylabel("Count of Articles (rated)")
-ax.set_title("Distribution of Vital Levels (rated pages)")
-for i, v in enumerate(vit_counts["count"].values):
-    ax.text(i, v, f"{v}", ha="center", va="bottom", fontsize=9)
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "vital_hist.png"))
-plt.close()
-
-# Links-away: histogram (integer steps)
-plt.figure(figsize=(10,5))
-ax = sns.histplot(df_links, x="links_away", bins=range(int(df_links["links_away"].min()), int(df_links["links_away"].max())+2), edgecolor=None)
-ax.set_xlabel("Links Away from Philosophy")
-ax.set_ylabel("Number of Articles")
-ax.set_title("Distribution of Distance to Philosophy (steps)")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "links_away_hist.png"))
-plt.close()
-
-# ECDFs (good for comparing shapes/medians visually)
-# Vital ECDF
-plt.figure(figsize=(8,5))
-vit_sorted = np.sort(df_vital["vital_level"].values)
-vit_ecdf = np.arange(1, len(vit_sorted)+1) / len(vit_sorted)
-plt.step(vit_sorted, vit_ecdf, where="post")
-plt.xlabel("Vital Level")
-plt.ylabel("ECDF")
-plt.title("ECDF of Vital Levels (rated pages)")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "vital_ecdf.png"))
-plt.close()
-
-# Links-away ECDF
-plt.figure(figsize=(10,5))
-la_sorted = np.sort(df_links["links_away"].values)
-la_ecdf = np.arange(1, len(la_sorted)+1) / len(la_sorted)
-plt.step(la_sorted, la_ecdf, where="post")
-plt.xlabel("Links Away from Philosophy")
-plt.ylabel("ECDF")
-plt.title("ECDF of Distance to Philosophy (steps)")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "links_away_ecdf.png"))
-plt.close()
-
-print("Saved tables: vital_distribution.csv, vital_desc.csv, links_away_distribution.csv, links_away_desc.csv")
-print("Saved plots: vital_hist.png, links_away_hist.png, vital_ecdf.png, links_away_ecdf.png")
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(HERE, "..", "data", "cleaned_data.csv")
+PLOTS_DIR = os.path.join(HERE, "plots")
+
+# Columns a cohort can be split on
+COHORTS = ("stop_reason", "vital_level")
+
+# (values, counts) for one integer-valued column
+Counts = Tuple[List[int], List[int]]
+
+# ------------------------------------
+# Preparation (parent process, pandas)
+# ------------------------------------
+def _counts(series) -> Counts:
+    vc = series.value_counts().sort_index()
+    return [int(v) for v in vc.index], [int(c) for c in vc.values]
+
+def filtered(df) -> Dict[str, object]:
+    """Rated vital levels (>0) and non-null links_away, as int series."""
+    return {
+        "vital_level": df.loc[df["vital_level"].notna() & (df["vital_level"] > 0), "vital_level"].astype(int),
+        "links_away": df.loc[df["links_away"].notna(), "links_away"].astype(int),
+    }
+
+def prepare(columns: Dict[str, object]) -> Dict[str, Counts]:
+    """Reduce the filtered columns to the value counts every figure is drawn from."""
+    return {name: _counts(series) for name, series in columns.items()}
+
+def write_tables(prepared: Dict[str, Counts], columns: Dict[str, object], plots_dir: str) -> None:
+    """Count/proportion tables from the prepared counts, describe() from the filtered columns."""
+    import pandas as pd
+
+    # 1) Vital distribution, 2) Links-away distribution (each integer step is a bin)
+    for name, table, desc in (("vital_level", "vital_distribution.csv", "vital_desc.csv"),
+                              ("links_away", "links_away_distribution.csv", "links_away_desc.csv")):
+        values, n = prepared[name]
+        counts = pd.DataFrame({"count": n}, index=pd.Index(values, name=name))
+        counts["proportion"] = counts["count"] / counts["count"].sum()
+        counts.to_csv(os.path.join(plots_dir, table))
+        columns[name].describe().to_frame(name=name).to_csv(os.path.join(plots_dir, desc))
+
+# ---------------------------
+# Rendering (worker processes)
+# ---------------------------
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_theme(style="whitegrid", context="talk")
+    return plt, sns
+
+def _save(plt, path: str) -> str:
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    return os.path.basename(path)
+
+def render_vital_hist(counts: Counts, path: str, label: str = "") -> str:
+    # Vital: bar chart (categorical levels 1–5)
+    plt, sns = _pyplot()
+    levels, n = counts
+    plt.figure(figsize=(8,5))
+    ax = sns.barplot(x=levels, y=n)
+    ax.set_xlabel("Vital Level")
+    ax.set_ylabel("Count of Articles (rated)")
+    ax.set_title(f"Distribution of Vital Levels (rated pages){label}")
+    for i, v in enumerate(n):
+        ax.text(i, v, f"{v}", ha="center", va="bottom", fontsize=9)
+    return _save(plt, path)
+
+def render_links_away_hist(counts: Counts, path: str, label: str = "") -> str:
+    # Links-away: histogram (integer steps)
+    plt, sns = _pyplot()
+    steps, n = counts
+    plt.figure(figsize=(10,5))
+    ax = sns.histplot(x=steps, weights=n, bins=range(min(steps), max(steps)+2), edgecolor=None)
+    ax.set_xlabel("Links Away from Philosophy")
+    ax.set_ylabel("Number of Articles")
+    ax.set_title(f"Distribution of Distance to Philosophy (steps){label}")
+    return _save(plt, path)
+
+def _ecdf(counts: Counts):
+    # Start at 1/N on the smallest value, as stepping through every sorted
+    # sample did, so the rise to the first value's full share is drawn
+    import numpy as np
+    values, n = counts
+    total = np.sum(n)
+    return np.asarray([values[0]] + values), np.concatenate(([1 / total], np.cumsum(n) / total))
+
+def render_vital_ecdf(counts: Counts, path: str, label: str = "") -> str:
+    plt, _ = _pyplot()
+    x, y = _ecdf(counts)
+    plt.figure(figsize=(8,5))
+    plt.step(x, y, where="post")
+    plt.xlabel("Vital Level")
+    plt.ylabel("ECDF")
+    plt.title(f"ECDF of Vital Levels (rated pages){label}")
+    return _save(plt, path)
+
+def render_links_away_ecdf(counts: Counts, path: str, label: str = "") -> str:
+    plt, _ = _pyplot()
+    x, y = _ecdf(counts)
+    plt.figure(figsize=(10,5))
+    plt.step(x, y, where="post")
+    plt.xlabel("Links Away from Philosophy")
+    plt.ylabel("ECDF")
+    plt.title(f"ECDF of Distance to Philosophy (steps){label}")
+    return _save(plt, path)
+
+# name -> (renderer, which prepared counts it draws)
+FIGURES = {
+    "vital_hist": (render_vital_hist, "vital_level"),
+    "links_away_hist": (render_links_away_hist, "links_away"),
+    "vital_ecdf": (render_vital_ecdf, "vital_level"),
+    "links_away_ecdf": (render_links_away_ecdf, "links_away"),
+}
+
+def _tasks(prepared: Dict[str, Counts], plots_dir: str, suffix: str = "", label: str = "",
+           skip: Optional[str] = None) -> List[tuple]:
+    tasks = []
+    for name, (fn, column) in FIGURES.items():
+        if column == skip:
+            continue
+        counts = prepared[column]
+        if not counts[0]:
+            continue  # e.g. a cohort with no rated pages
+        tasks.append((fn, counts, os.path.join(plots_dir, f"{name}{suffix}.png"), label))
+    return tasks
+
+def cohort_tasks(df, cohort: str, plots_dir: str) -> List[tuple]:
+    """Figure tasks for every value of `cohort` (one of COHORTS), except plots of that column."""
+    if cohort not in COHORTS:
+        raise ValueError(f"unknown cohort {cohort!r}, expected one of {COHORTS}")
+    tasks = []
+    col = df[cohort]
+    if cohort == "vital_level":
+        col = col.fillna(0).astype(int)
+    for value in sorted(col.dropna().unique()):
+        sub = df.loc[col == value]
+        tasks += _tasks(prepare(filtered(sub)), plots_dir, f"_{cohort}_{value}", f"\n{cohort} = {value}",
+                        skip=cohort)
+    return tasks
+
+def render_all(tasks: Iterable[tuple], jobs: Optional[int] = None) -> List[str]:
+    """Render each (fn, counts, path, label) task in a process pool."""
+    tasks = list(tasks)
+    if jobs == 1:
+        return [fn(*args) for fn, *args in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(fn, *args) for fn, *args in tasks]
+        return [f.result() for f in futures]
+
+def main(data_path: str = DATA_PATH, plots_dir: str = PLOTS_DIR,
+         cohorts: Iterable[str] = (), jobs: Optional[int] = None) -> None:
+    import pandas as pd
+
+    os.makedirs(plots_dir, exist_ok=True)
+    df = pd.read_csv(data_path)
+
+    columns = filtered(df)
+    prepared = prepare(columns)
+    write_tables(prepared, columns, plots_dir)
+    tasks = _tasks(prepared, plots_dir)
+    for cohort in cohorts:
+        if cohort == "stop_reason":
+            from clean_data import load_all_runs
+            tasks += cohort_tasks(load_all_runs(), cohort, plots_dir)
+        else:
+            tasks += cohort_tasks(df, cohort, plots_dir)
+    saved = render_all(tasks, jobs)
+
+    print("Saved tables: vital_distribution.csv, vital_desc.csv, links_away_distribution.csv, links_away_desc.csv")
+    print(f"Saved plots: {', '.join(saved)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Offline benchmark and regression gate for the first_link parser.
+
+Runs first_link_from_html, strip_parentheses, _link_is_in_parentheses and
+in_ignored_container over the stored corpus in data/bench/first_link/ plus a
+few generated adversarial documents (very long articles, deeply nested
+parentheses, link-heavy infoboxes). For every document it reports the best
+parse time and the peak traced allocation, checks the selected link against
+expected.json, and compares throughput to baseline.json.
+
+Usage:
+  python3 bench_first_link.py                     # check against baseline.json
+  python3 bench_first_link.py --update-baseline   # record this machine's numbers
+  python3 bench_first_link.py --threshold 0.3     # allowed slowdown (default 0.25)
+  python3 bench_first_link.py --fetch Fencing "State (polity)"
+                                                  # save real pages into the corpus
+
+Exits non-zero if a selected link changed or first_link time over the stored
+pages, or over the generated documents, got slower than
+baseline * (1 + threshold); the two groups are gated separately so the large
+generated cases cannot hide a slowdown on the stored pages. Each group is
+timed by passing over its documents until a round takes at least
+--min-time (0.1 s by default), and the gate uses the median per-pass time of
+--rounds such rounds. Per-document best times are only reported, since
+sub-millisecond documents are too noisy to gate on.
+Baselines are machine-specific and only written by --update-baseline; a
+missing baseline or a corpus that no longer matches it also fails, so the
+throughput check is never skipped silently. Never touches the network, except --fetch.
+
+The stored corpus is currently only hand-written synthetic fixtures
+(synthetic_*.html): small pages built to exercise one parser rule each
+(parenthesised links, pronunciation spans, sidebars, skipped titles, a
+section fallback). They are not captured articles, and their expected links
+were not checked against Wikipedia. Real pages are added with --fetch, which
+also creates SOURCES.txt; none have been captured yet.
+
+--fetch saves the full article HTML of the page's current revision through
+index.php?oldid=, so the file is reproducible, and appends the title and
+revision to SOURCES.txt (content is CC BY-SA 4.0, Wikipedia contributors).
+The link the parser picks is written to expected.json and printed; check it
+against the live article before committing.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from wikidata_html import (first_link_from_html, strip_parentheses,
+                           _link_is_in_parentheses, in_ignored_container)
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "bench", "first_link")
+EXPECTED_JSON = os.path.join(CORPUS_DIR, "expected.json")
+BASELINE_JSON = os.path.join(CORPUS_DIR, "baseline.json")
+SOURCES_TXT = os.path.join(CORPUS_DIR, "SOURCES.txt")
+
+WIKI_API = "https://en.wikipedia.org/w/api.php"
+WIKI_INDEX = "https://en.wikipedia.org/w/index.php"
+USER_AGENT = "WikipediaFoundations-bench/0.1 (first_link benchmark corpus)"
+
+# -----------------
+# Corpus
+# -----------------
+def _article(body: str) -> bytes:
+    return (
+        '<html><body><div id="mw-content-text"><div class="mw-parser-output">'
+        + body + "</div></div></body></html>"
+    ).encode("utf-8")
+
+def _long_article(sections: int = 400) -> bytes:
+    lead = '<p>A <b>long article</b> is a <a href="/wiki/Document">document</a> with many sections.</p>'
+    para = ('<p>Paragraph {i} mentions <a href="/wiki/Topic_{i}">topic {i}</a> '
+            '(see <a href="/wiki/Aside_{i}">aside</a>) and cites a source.'
+            '<sup class="reference"><a href="#cite_note-{i}">[{i}]</a></sup></p>')
+    return _article(lead + "".join(
+        f'<div class="mw-heading mw-heading2"><h2>Section {i}</h2></div>' + para.format(i=i)
+        for i in range(sections)))
+
+def _deep_parentheses(depth: int = 300) -> bytes:
+    opening = "".join(f'(<a href="/wiki/Inner_{i}">inner {i}</a> ' for i in range(depth))
+    return _article(f'<p>Start {opening}{")" * depth} then <a href="/wiki/Outside">outside</a>.</p>')
+
+def _infobox_flood(rows: int = 2000) -> bytes:
+    table = "".join(
+        f'<tr><th>Field {i}</th><td><a href="/wiki/Value_{i}">value {i}</a></td></tr>'
+        for i in range(rows))
+    hatnotes = "".join(
+        f'<div role="note" class="hatnote">See also <a href="/wiki/Other_{i}">other {i}</a>.</div>'
+        for i in range(50))
+    return _article(hatnotes + f'<table class="infobox"><tbody>{table}</tbody></table>'
+                    '<p>The <b>subject</b> is a <a href="/wiki/Thing">thing</a>.</p>')
+
+def _late_link(paragraphs: int = 300) -> bytes:
+    # Every early link is parenthesised, so each paragraph is scanned in full
+    filler = "".join(
+        f'<p>Filler {i} (<a href="/wiki/Skip_{i}">skip</a>, <a href="/wiki/Skip_{i}b">skip</a>).</p>'
+        for i in range(paragraphs))
+    return _article(filler + '<p>Finally a <a href="/wiki/Target">target</a>.</p>')
+
+GENERATED: Dict[str, Tuple[Callable[[], bytes], Optional[str]]] = {
+    "generated:long_article": (_long_article, "https://en.wikipedia.org/wiki/Document"),
+    "generated:deep_parentheses": (_deep_parentheses, "https://en.wikipedia.org/wiki/Outside"),
+    "generated:infobox_flood": (_infobox_flood, "https://en.wikipedia.org/wiki/Thing"),
+    "generated:late_link": (_late_link, "https://en.wikipedia.org/wiki/Target"),
+}
+
+def load_corpus() -> List[Tuple[str, bytes, Optional[str]]]:
+    with open(EXPECTED_JSON, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    docs = []
+    for name in sorted(expected):
+        with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+            docs.append((name, f.read(), expected[name]))
+    for name, (make, url) in GENERATED.items():
+        docs.append((name, make(), url))
+    return docs
+
+def fetch_pages(titles: List[str]) -> None:
+    """Save the current revision of each title into the corpus and record its first link."""
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    with open(EXPECTED_JSON, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    for title in titles:
+        params = {"action": "query", "format": "json", "formatversion": "2",
+                  "prop": "info", "titles": title, "redirects": 1}
+        r = session.get(WIKI_API, params=params, timeout=(5, 20))
+        r.raise_for_status()
+        page = r.json()["query"]["pages"][0]
+        if page.get("missing"):
+            raise SystemExit(f"{title}: no such page")
+        canon, revid = page["title"], page["lastrevid"]
+
+        r = session.get(WIKI_INDEX, params={"title": canon, "oldid": revid}, timeout=(5, 20))
+        r.raise_for_status()
+        name = canon.replace(" ", "_").replace("/", "_") + ".html"
+        with open(os.path.join(CORPUS_DIR, name), "wb") as f:
+            f.write(r.content)
+
+        got = first_link_from_html(r.content)
+        expected[name] = got[0] if got else None
+        with open(SOURCES_TXT, "a", encoding="utf-8") as f:
+            f.write(f"{name}\t{canon}\toldid={revid}\t{WIKI_INDEX}?oldid={revid}\n")
+        print(f"{name}: {len(r.content) / 1024:.0f} KiB, oldid={revid}, first link {expected[name]}")
+
+    with open(EXPECTED_JSON, "w", encoding="utf-8") as f:
+        json.dump(expected, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+# -----------------
+# Measurement
+# -----------------
+def _helpers(html: bytes) -> None:
+    # The helpers on their own, over every anchor of every lead paragraph
+    strip_parentheses(html)
+    soup = BeautifulSoup(html, "html.parser")
+    for p in soup.select("div.mw-parser-output > p"):
+        for a in p.find_all("a"):
+            _link_is_in_parentheses(p, a)
+            in_ignored_container(a)
+
+def _best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _group_time(htmls: List[bytes], rounds: int, min_time: float) -> float:
+    """Median seconds per pass over htmls, each round repeating passes until it lasts min_time."""
+    def run(loops: int) -> float:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            for html in htmls:
+                first_link_from_html(html)
+        return time.perf_counter() - t0
+
+    loops = 1
+    while run(loops) < min_time:
+        loops *= 2
+    return statistics.median(run(loops) / loops for _ in range(rounds))
+
+def _peak_alloc(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(docs, repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, html, expected in docs:
+        got = first_link_from_html(html)
+        url = got[0] if got else None
+        results[name] = {
+            "bytes": len(html),
+            "first_link_s": _best_time(lambda: first_link_from_html(html), repeat),
+            "helpers_s": _best_time(lambda: _helpers(html), repeat),
+            "peak_alloc": _peak_alloc(lambda: first_link_from_html(html)),
+            "url": url,
+            "ok": url == expected,
+            "expected": expected,
+        }
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="first_link parser benchmark")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timings per document; the best is reported")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="timed rounds per group; the median is gated on")
+    parser.add_argument("--min-time", type=float, default=0.1,
+                        help="seconds each group round must last")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail if the corpus is this much slower than baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--fetch", nargs="+", metavar="TITLE",
+                        help="save these articles' current revisions into the corpus and exit")
+    args = parser.parse_args(argv)
+
+    if args.fetch:
+        fetch_pages(args.fetch)
+        return 0
+
+    docs = load_corpus()
+    results = measure(docs, args.repeat)
+    groups = {
+        "stored": _group_time([html for name, html, _ in docs if name not in GENERATED],
+                              args.rounds, args.min_time),
+        "generated": _group_time([html for name, html, _ in docs if name in GENERATED],
+                                 args.rounds, args.min_time),
+    }
+
+    baseline, base_groups = {}, {}
+    if os.path.exists(BASELINE_JSON) and not args.update_baseline:
+        with open(BASELINE_JSON, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline, base_groups = saved.get("documents", {}), saved.get("groups", {})
+
+    failures = []
+    print(f"{'document':32} {'KiB':>7} {'first_link ms':>14} {'helpers ms':>11} {'peak KiB':>9} {'vs base':>8}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        ratio = r["first_link_s"] / base["first_link_s"] if base else None
+        print(f"{name:32} {r['bytes'] / 1024:7.1f} {r['first_link_s'] * 1e3:14.2f} "
+              f"{r['helpers_s'] * 1e3:11.2f} {r['peak_alloc'] / 1024:9.0f} "
+              f"{f'{ratio:.2f}x' if ratio else '-':>8}")
+        if not r["ok"]:
+            failures.append(f"{name}: selected {r['url']!r}, expected {r['expected']!r}")
+
+    if args.update_baseline:
+        pass  # nothing to compare against until the new baseline is written
+    elif not baseline:
+        failures.append(f"throughput check skipped: no baseline at {BASELINE_JSON}; "
+                        "record one with --update-baseline")
+    elif set(baseline) != set(results) or set(base_groups) != set(groups):
+        failures.append("throughput check skipped: corpus differs from the baseline "
+                        f"(added {sorted(set(results) - set(baseline))}, "
+                        f"removed {sorted(set(baseline) - set(results))}); "
+                        "rerun with --update-baseline")
+    else:
+        for group, total in groups.items():
+            ratio = total / base_groups[group]
+            print(f"{group} first_link {total * 1e3:.1f} ms per pass, {ratio:.2f}x baseline")
+            if ratio > 1 + args.threshold:
+                failures.append(f"{group} first_link throughput {ratio:.2f}x slower than baseline")
+
+    if args.update_baseline:
+        with open(BASELINE_JSON, "w", encoding="utf-8") as f:
+            json.dump({
+                "documents": {n: {"first_link_s": r["first_link_s"], "helpers_s": r["helpers_s"],
+                                  "peak_alloc": r["peak_alloc"]} for n, r in results.items()},
+                "groups": groups,
+            }, f, indent=2, sort_keys=True)
+        print(f"Wrote baseline to {BASELINE_JSON}")
+
+    for msg in failures:
+        print("FAIL " + msg)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
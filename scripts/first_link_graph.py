@@ -0,0 +1,336 @@
+"""
+Compact on-disk first-link graph with a subtree/ancestor query API.
+
+File layout (all integers little-endian int32, sections 4-byte aligned):
+
+  header       MAGIC, VERSION, n_nodes, n_edges, n_roots, title_bytes
+  out_off      [n_nodes + 1]   CSR offsets into out_dst
+  out_dst      [n_edges]       first-link target of each node
+  in_off       [n_nodes + 1]   CSR offsets into in_src
+  in_src       [n_edges]       nodes whose first link points here
+  dist         [n_nodes]       links away from Philosophy (-1 if it never gets there)
+  tin          [n_nodes]       Euler-tour entry index (-1 if not under a root)
+  tout         [n_nodes]       Euler-tour exit index, tout - tin == subtree size
+  title_off    [n_nodes + 1]   offsets into the title blob
+  titles       utf-8 blob, node ids are assigned in sorted title order
+
+The file is opened with mmap and every array is a memoryview over the mapping,
+so loading is zero-copy and the pages are shared between processes.
+
+Usage:
+  python3 first_link_graph.py build [edges.csv] [out.bin]
+  python3 first_link_graph.py path <title>
+  python3 first_link_graph.py through <title>
+  python3 first_link_graph.py ancestor <title> <title>
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+HYPERLINK_CSV = os.path.join(DATA_DIR, "hyperlink_data.csv")
+GRAPH_BIN = os.path.join(DATA_DIR, "first_link_graph.bin")
+
+MAGIC = b"WFLGRAPH"
+VERSION = 2
+HEADER = struct.Struct("<8sIIIII")
+
+ROOTS = ("Philosophy",)
+# Same normalization as analysis/clean_data.py
+ALIASES = {"Philosophical": "Philosophy"}
+
+def _norm_title(title: str) -> str:
+    # "Subregion#Asia" is the Subregion article, so section anchors are dropped
+    title = unquote(title).split("#")[0].replace("_", " ").strip()
+    return ALIASES.get(title, title)
+
+def edges_from_hyperlink_csv(path: str = HYPERLINK_CSV) -> List[Tuple[str, str]]:
+    """Consecutive rows of the same run are (page, first link of page) edges."""
+    edges: List[Tuple[str, str]] = []
+    prev_run, prev_title = None, None
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            run_id, title = row["run_id"], row["page_title"]
+            if run_id == prev_run:
+                edges.append((prev_title, title))
+            prev_run, prev_title = run_id, title
+    return edges
+
+def _euler_tour(n: int, parent: List[int], roots: List[int]) -> Tuple[array, array, array]:
+    children: List[List[int]] = [[] for _ in range(n)]
+    for v, p in enumerate(parent):
+        if p >= 0:
+            children[p].append(v)
+
+    dist = array("i", [-1]) * n
+    tin = array("i", [-1]) * n
+    tout = array("i", [-1]) * n
+    clock = 0
+    for root in roots:
+        dist[root] = 0
+        tin[root] = clock
+        clock += 1
+        stack = [(root, iter(children[root]))]
+        while stack:
+            node, it = stack[-1]
+            child = next(it, None)
+            if child is None:
+                tout[node] = clock
+                stack.pop()
+                continue
+            # Nodes on a cycle are never reached from a root, so no guard is needed
+            dist[child] = dist[node] + 1
+            tin[child] = clock
+            clock += 1
+            stack.append((child, iter(children[child])))
+    return dist, tin, tout
+
+def build_graph(edges: Iterable[Tuple[str, str]], out_path: str = GRAPH_BIN,
+                roots: Iterable[str] = ROOTS) -> int:
+    """
+    Write a graph file from (source_title, first_link_title) pairs.
+    A title keeps only its most recently seen first link; roots keep none.
+    Returns the number of nodes written.
+    """
+    root_titles = {_norm_title(r) for r in roots}
+    first: Dict[str, str] = {}
+    titles = set(root_titles)
+    for src, dst in edges:
+        src, dst = _norm_title(src), _norm_title(dst)
+        titles.add(src)
+        titles.add(dst)
+        if src not in root_titles and src != dst:
+            first[src] = dst
+
+    names = sorted(titles, key=lambda t: t.encode("utf-8"))
+    index = {t: i for i, t in enumerate(names)}
+    n = len(names)
+
+    parent = [-1] * n
+    for src, dst in first.items():
+        parent[index[src]] = index[dst]
+
+    out_off = array("i", [0]) * (n + 1)
+    out_dst = array("i")
+    in_count = [0] * n
+    for v in range(n):
+        if parent[v] >= 0:
+            out_dst.append(parent[v])
+            in_count[parent[v]] += 1
+        out_off[v + 1] = len(out_dst)
+
+    in_off = array("i", [0]) * (n + 1)
+    for v in range(n):
+        in_off[v + 1] = in_off[v] + in_count[v]
+    in_src = array("i", [0]) * len(out_dst)
+    fill = list(in_off[:n])
+    for v in range(n):
+        p = parent[v]
+        if p >= 0:
+            in_src[fill[p]] = v
+            fill[p] += 1
+
+    root_ids = sorted(index[r] for r in root_titles)
+    dist, tin, tout = _euler_tour(n, parent, root_ids)
+
+    blob = bytearray()
+    title_off = array("i", [0]) * (n + 1)
+    for i, t in enumerate(names):
+        blob += t.encode("utf-8")
+        title_off[i + 1] = len(blob)
+
+    sections = (out_off, out_dst, in_off, in_src, dist, tin, tout, title_off)
+    if sys.byteorder != "little":
+        for a in sections:
+            a.byteswap()
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, len(out_dst), len(root_ids), len(blob)))
+        for a in sections:
+            a.tofile(f)
+        f.write(blob)
+    os.replace(tmp, out_path)
+    return n
+
+class FirstLinkGraph:
+    """Read-only view over a graph file written by build_graph."""
+
+    def __init__(self, path: str = GRAPH_BIN):
+        if sys.byteorder != "little":
+            raise RuntimeError("first-link graph files are little-endian only")
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, m, self.n_roots, blob_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} first-link graph")
+        self.n_nodes, self.n_edges = n, m
+
+        view = memoryview(self._mm)
+        pos = HEADER.size
+
+        def ints(count: int) -> memoryview:
+            nonlocal pos
+            mv = view[pos:pos + 4 * count].cast("i")
+            pos += 4 * count
+            return mv
+
+        self._out_off = ints(n + 1)
+        self._out_dst = ints(m)
+        self._in_off = ints(n + 1)
+        self._in_src = ints(m)
+        self._dist = ints(n)
+        self._tin = ints(n)
+        self._tout = ints(n)
+        self._title_off = ints(n + 1)
+        self._titles = view[pos:pos + blob_len]
+
+    def close(self) -> None:
+        for name in ("_out_off", "_out_dst", "_in_off", "_in_src",
+                     "_dist", "_tin", "_tout", "_title_off", "_titles"):
+            getattr(self, name).release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    def __contains__(self, title: str) -> bool:
+        return self.node_id(title) is not None
+
+    # -----------------
+    # Node lookup
+    # -----------------
+    def _title_bytes(self, i: int) -> bytes:
+        return self._titles[self._title_off[i]:self._title_off[i + 1]].tobytes()
+
+    def title(self, i: int) -> str:
+        return self._title_bytes(i).decode("utf-8")
+
+    def node_id(self, title: str) -> Optional[int]:
+        """Binary search the sorted title table."""
+        key = _norm_title(title).encode("utf-8")
+        lo, hi = 0, self.n_nodes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_nodes and self._title_bytes(lo) == key:
+            return lo
+        return None
+
+    def _require(self, title: str) -> int:
+        i = self.node_id(title)
+        if i is None:
+            raise KeyError(title)
+        return i
+
+    def _parent(self, i: int) -> int:
+        start = self._out_off[i]
+        return self._out_dst[start] if start < self._out_off[i + 1] else -1
+
+    def _is_ancestor(self, a: int, b: int) -> bool:
+        return self._tin[a] >= 0 and self._tin[a] <= self._tin[b] < self._tout[a]
+
+    # -----------------
+    # Queries
+    # -----------------
+    def first_link(self, title: str) -> Optional[str]:
+        p = self._parent(self._require(title))
+        return self.title(p) if p >= 0 else None
+
+    def links_away(self, title: str) -> Optional[int]:
+        d = self._dist[self._require(title)]
+        return d if d >= 0 else None
+
+    def path_to_philosophy(self, title: str) -> Optional[List[str]]:
+        """Titles from `title` to the root inclusive, or None if it never gets there."""
+        i = self._require(title)
+        if self._dist[i] < 0:
+            return None
+        path = [self.title(i)]
+        while self._dist[i] > 0:
+            i = self._parent(i)
+            path.append(self.title(i))
+        return path
+
+    def routes_through(self, title: str) -> int:
+        """Number of other known articles whose path to Philosophy passes through `title`."""
+        i = self._require(title)
+        if self._tin[i] < 0:
+            # Not connected to a root; count its (acyclic part of the) in-tree directly
+            seen, stack = {i}, [i]
+            while stack:
+                v = stack.pop()
+                for k in range(self._in_off[v], self._in_off[v + 1]):
+                    u = self._in_src[k]
+                    if u not in seen:
+                        seen.add(u)
+                        stack.append(u)
+            return len(seen) - 1
+        return self._tout[i] - self._tin[i] - 1
+
+    def linked_from(self, title: str) -> List[str]:
+        """Titles whose first link is `title`."""
+        i = self._require(title)
+        return [self.title(self._in_src[k]) for k in range(self._in_off[i], self._in_off[i + 1])]
+
+    def common_ancestor(self, a: str, b: str) -> Optional[str]:
+        """Closest title both paths to Philosophy pass through, or None."""
+        i, j = self._require(a), self._require(b)
+        if self._tin[i] < 0 or self._tin[j] < 0:
+            return None
+        while not self._is_ancestor(i, j):
+            i = self._parent(i)
+            if i < 0:
+                return None
+        return self.title(i)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--graph", default=GRAPH_BIN)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build")
+    p_build.add_argument("edges_csv", nargs="?", default=HYPERLINK_CSV)
+    p_build.add_argument("out", nargs="?", default=None)
+    sub.add_parser("path").add_argument("title")
+    sub.add_parser("through").add_argument("title")
+    p_anc = sub.add_parser("ancestor")
+    p_anc.add_argument("a")
+    p_anc.add_argument("b")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        out = args.out or args.graph
+        n = build_graph(edges_from_hyperlink_csv(args.edges_csv), out)
+        print(f"Wrote {n} nodes to {out}")
+        return
+
+    with FirstLinkGraph(args.graph) as g:
+        try:
+            if args.cmd == "path":
+                path = g.path_to_philosophy(args.title)
+                print(" -> ".join(path) if path else "does not reach Philosophy")
+            elif args.cmd == "through":
+                print(g.routes_through(args.title))
+            elif args.cmd == "ancestor":
+                print(g.common_ancestor(args.a, args.b))
+        except KeyError as e:
+            sys.exit(f"unknown title: {e.args[0]}")
+
+if __name__ == "__main__":
+    main()
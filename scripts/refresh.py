@@ -0,0 +1,235 @@
+"""
+Revision-aware incremental recrawl of known first-link edges.
+
+Every title already in hyperlink_data.csv has its current lastrevid checked
+with batched prop=info queries (50 titles per request) and compared to
+data/logs/revisions.csv. Only pages whose revision changed are fetched and
+re-parsed. When a page's first link moved, the new link is followed until
+it rejoins a known title, every run passing through the page is rewritten
+in hyperlink_data.csv from that point on, and the first-link graph file
+(distances and subtree indices) is rebuilt.
+
+Usage:
+  python3 refresh.py          # recrawl pages edited since the last refresh
+  python3 refresh.py --seed   # only record current revisions, no recrawl
+
+wikidata.py records each page's revision as it crawls it. Titles without a
+stored revision are recorded rather than refetched, and the first refresh
+(no revisions.csv yet) only seeds, so cost follows the edit rate. A request
+error while following a new first link leaves that page's old edge and
+revision in place, so it is retried next time.
+"""
+
+import argparse
+import csv
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import requests
+
+from wikidata import (WIKI_API, HYPERLINK_CSV, VISITED_TXT, REVISIONS_CSV, GRAPH_BIN, MAX_STEPS, DELAY,
+                      init_session, write_api_rows, append_visited_titles)
+from wikidata_html import first_link, resolve_redirects, title_of
+from wikidata_api import fetch_api_rows_for_titles, fetch_lastrevids
+from first_link_graph import build_graph, edges_from_hyperlink_csv
+
+ROOT_TITLES = {"Philosophy", "Philosophical"}
+
+HEADER = ["run_id","steps_total","page_title","page_url","stop_reason","links_away"]
+
+def load_revisions(path: str = REVISIONS_CSV) -> Dict[str, int]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["page_title"]: int(row["lastrevid"]) for row in csv.DictReader(f)}
+
+def save_revisions(revs: Dict[str, int], path: str = REVISIONS_CSV) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["page_title", "lastrevid"])
+        for t in sorted(revs):
+            w.writerow([t, revs[t]])
+    os.replace(tmp, path)
+
+def _load_runs(path: str = HYPERLINK_CSV) -> Tuple[Dict[str, List[dict]], Dict[str, str], Dict[str, str]]:
+    """Runs keyed by run_id, last-seen first link per title, and the URL of every title."""
+    runs: Dict[str, List[dict]] = {}
+    edges: Dict[str, str] = {}
+    urls: Dict[str, str] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            rows = runs.setdefault(row["run_id"], [])
+            if rows:
+                edges[rows[-1]["page_title"]] = row["page_title"]
+            rows.append(row)
+            urls[row["page_title"]] = row["page_url"]
+    return runs, edges, urls
+
+def _next_title(session: requests.Session, url: str) -> Optional[Tuple[str, str]]:
+    """(title, url) of the current first link, or None for a dead end."""
+    nxt = first_link(session, url)
+    if not nxt:
+        return None
+    next_url = resolve_redirects(session, nxt[0])
+    return title_of(next_url), next_url
+
+def _extend(session: requests.Session, title: str, edges: Dict[str, str],
+            urls: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Crawl forward from a title with no known edge until the path rejoins known data.
+    Returns the edges and URLs found; nothing is merged, so a request error
+    partway leaves no half-followed path behind.
+    """
+    found_edges: Dict[str, str] = {}
+    found_urls: Dict[str, str] = {}
+    for _ in range(MAX_STEPS):
+        if title in ROOT_TITLES or title in edges or title in found_edges:
+            break
+        nxt = _next_title(session, found_urls.get(title) or urls[title])
+        if nxt is None:
+            break
+        found_edges[title], found_urls[nxt[0]] = nxt
+        title = nxt[0]
+        time.sleep(DELAY)
+    return found_edges, found_urls
+
+def _walk(start: List[str], edges: Dict[str, str]) -> Tuple[List[str], str]:
+    """Continue a path prefix along the edge map, same stop rules as steps_to_philosophy."""
+    path = list(start)
+    seen = set(path[:-1])
+    while len(path) <= MAX_STEPS:
+        t = path[-1]
+        if t in ROOT_TITLES:
+            return path, "reached_philosophy"
+        if t in seen:
+            return path, "loop"
+        seen.add(t)
+        if t not in edges:
+            return path, "dead_end"
+        path.append(edges[t])
+    return path, "max_steps_exceeded"
+
+def _rows_for(run_id: str, titles: List[str], stop_reason: str, urls: Dict[str, str]) -> List[dict]:
+    steps_total = len(titles) - 1
+    reached = stop_reason == "reached_philosophy"
+    return [{
+        "run_id": run_id,
+        "steps_total": steps_total,
+        "page_title": t,
+        "page_url": urls[t],
+        "stop_reason": stop_reason,
+        "links_away": (steps_total - i) if reached else "n/a",
+    } for i, t in enumerate(titles)]
+
+def refresh(session: requests.Session, seed: bool = False) -> None:
+    runs, edges, urls = _load_runs()
+    if not os.path.exists(REVISIONS_CSV):
+        print(f"No {os.path.basename(REVISIONS_CSV)} yet, recording current revisions instead of recrawling")
+        seed = True
+    stored = load_revisions()
+    titles = sorted(urls)
+    current = fetch_lastrevids(session, WIKI_API, titles)
+
+    # A title with no stored revision was crawled before revisions were tracked;
+    # its current revision becomes the reference instead of forcing a refetch
+    unseen = [t for t in titles if t not in stored and current[t] is not None]
+    changed = [t for t in titles
+               if t in stored and current[t] is not None and current[t] != stored[t] and t not in ROOT_TITLES]
+    revs = {t: r for t, r in current.items() if r is not None}
+    print(f"{len(changed)} of {len(titles)} pages changed since the last refresh, "
+          f"{len(unseen)} seen for the first time")
+    if seed:
+        save_revisions(revs)
+        return
+
+    def keep_unrefreshed(t: str) -> None:
+        # Keep the old revision so the page is retried on the next refresh
+        revs[t] = stored[t]
+
+    known = set(titles)
+    moved: Set[str] = set()
+    old_edges: Dict[str, Optional[str]] = {}
+    sources: Dict[str, List[str]] = {}  # uncrawled title -> changed pages now linking to it
+    for t in changed:
+        try:
+            nxt = _next_title(session, urls[t])
+        except requests.RequestException:
+            keep_unrefreshed(t)
+            continue
+        old = edges.get(t)
+        if nxt is None:
+            if old is not None:
+                old_edges[t] = old
+                del edges[t]
+                moved.add(t)
+        elif nxt[0] != old:
+            old_edges[t] = old
+            edges[t], urls[nxt[0]] = nxt
+            moved.add(t)
+            if nxt[0] not in known:
+                sources.setdefault(nxt[0], []).append(t)
+        time.sleep(DELAY)
+
+    new_titles: Set[str] = set()
+    for nt in sorted(sources):
+        try:
+            found_edges, found_urls = _extend(session, nt, edges, urls)
+        except requests.RequestException:
+            # Put the linking pages back as they were; they are retried next time
+            for t in sources[nt]:
+                if old_edges[t] is None:
+                    edges.pop(t, None)
+                else:
+                    edges[t] = old_edges[t]
+                moved.discard(t)
+                keep_unrefreshed(t)
+            continue
+        edges.update(found_edges)
+        urls.update(found_urls)
+        new_titles.add(nt)
+        new_titles.update(found_urls)
+
+    rewritten = 0
+    for run_id, rows in runs.items():
+        path = [r["page_title"] for r in rows]
+        cut = next((i for i, t in enumerate(path) if t in moved), None)
+        if cut is None:
+            continue
+        new_path, stop_reason = _walk(path[:cut + 1], edges)
+        runs[run_id] = _rows_for(run_id, new_path, stop_reason, urls)
+        rewritten += 1
+
+    if rewritten:
+        tmp = HYPERLINK_CSV + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=HEADER)
+            w.writeheader()
+            for rows in runs.values():
+                w.writerows(rows)
+        os.replace(tmp, HYPERLINK_CSV)
+
+    if moved and os.path.exists(GRAPH_BIN):
+        build_graph(edges_from_hyperlink_csv(HYPERLINK_CSV), GRAPH_BIN)
+    save_revisions(revs)
+
+    added = sorted(new_titles - known)
+    if added:
+        first_run = next((r for r, rows in runs.items()
+                          if any(row["page_title"] in new_titles for row in rows)), 0)
+        try:
+            api_rows = fetch_api_rows_for_titles(session, WIKI_API, added, VISITED_TXT)
+            write_api_rows(api_rows, first_run)
+            append_visited_titles(added)
+            revs.update({r["requested_title"]: r["lastrevid"] for r in api_rows if r["lastrevid"] is not None})
+            save_revisions(revs)
+        except requests.RequestException as e:
+            print(f"Could not fetch API data for {len(added)} new pages: {e}")
+    print(f"{len(moved)} first links moved, {len(added)} new pages, {rewritten} runs rewritten")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recrawl pages edited since the last refresh")
+    parser.add_argument("--seed", action="store_true",
+                        help="record current revisions without refetching anything")
+    args = parser.parse_args()
+    refresh(init_session(), args.seed)
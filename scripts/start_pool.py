@@ -0,0 +1,155 @@
+# scripts/start_pool.py
+
+import os
+import threading
+from collections import deque
+from typing import Deque, Iterable, Optional, Set
+from urllib.parse import quote, unquote
+import requests
+
+RANDOM_BATCH = 500  # rnlimit ceiling for non-bot accounts
+
+def _norm(title: str) -> str:
+    return unquote(title).replace("_", " ").strip()
+
+def url_of(title: str) -> str:
+    """Article URL in the same percent-encoded form Special:Random redirects to."""
+    return "https://en.wikipedia.org/wiki/" + quote(title.replace(" ", "_"), safe=";@$!*(),/~:")
+
+def _read_lines(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def fetch_random_titles(session: requests.Session, api: str, limit: int = RANDOM_BATCH) -> list:
+    """One list=random call; redirects are filtered out server-side."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "list": "random",
+        "rnnamespace": 0,
+        "rnfilterredir": "nonredirects",
+        "rnlimit": min(max(limit, 1), RANDOM_BATCH),
+    }
+    r = session.get(api, params=params, timeout=(5, 20))
+    r.raise_for_status()
+    data = r.json()
+    return [p["title"] for p in (data.get("query", {}) or {}).get("random", []) or [] if p.get("title")]
+
+class StartPool:
+    """
+    Persistent queue of random start titles.
+
+    Titles come from list=random in batches, skip anything already in
+    visited.txt or the first-link graph, and are stored one per line in
+    pool_path so unused starts survive between invocations. When fewer than
+    low_water titles remain a background thread fetches another batch.
+    """
+
+    def __init__(self, api: str, pool_path: str, visited_path: str,
+                 graph_path: Optional[str] = None, low_water: int = 100):
+        self.api = api
+        self.pool_path = pool_path
+        self.visited_path = visited_path
+        self.graph_path = graph_path
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._refill: Optional[threading.Thread] = None
+        # _seen is everything queued or excluded, so fills never add a title twice;
+        # _excluded is only what must never be handed out, checked again in take()
+        self._seen: Set[str] = set()
+        self._excluded: Set[str] = set()
+        self._queue: Deque[str] = deque()
+
+        self.exclude(_read_lines(visited_path))
+        for t in _read_lines(pool_path):
+            key = _norm(t)
+            if key not in self._seen:
+                self._seen.add(key)
+                self._queue.append(t)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def exclude(self, titles: Iterable[str]) -> None:
+        """Never hand out these titles (e.g. pages a run just visited), even if already queued."""
+        keys = {_norm(t) for t in titles}
+        with self._lock:
+            self._excluded |= keys
+            self._seen |= keys
+
+    def _in_graph(self, titles: list) -> Set[str]:
+        if not self.graph_path or not os.path.exists(self.graph_path):
+            return set()
+        # The graph file is mmapped, so opening it per batch is cheap and picks
+        # up rebuilds made while the crawler is running
+        from first_link_graph import FirstLinkGraph
+        with FirstLinkGraph(self.graph_path) as g:
+            return {t for t in titles if t in g}
+
+    def _save(self) -> None:
+        tmp = self.pool_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for t in self._queue:
+                f.write(t + "\n")
+        os.replace(tmp, self.pool_path)
+
+    def fill(self, session: requests.Session) -> int:
+        """Fetch one batch and append the unseen titles. Returns how many were added."""
+        titles = fetch_random_titles(session, self.api)
+        crawled = self._in_graph(titles)
+        with self._lock:
+            added = 0
+            for t in titles:
+                key = _norm(t)
+                if key in self._seen or t in crawled:
+                    continue
+                self._seen.add(key)
+                self._queue.append(t)
+                added += 1
+            self._save()
+        return added
+
+    def _refill_in_background(self) -> None:
+        if self._refill is not None and self._refill.is_alive():
+            return
+
+        def work():
+            try:
+                # requests.Session is not thread-safe, so the refill gets its own
+                with requests.Session() as s:
+                    self.fill(s)
+            except Exception:
+                pass  # the next take() falls back to a synchronous fill
+
+        self._refill = threading.Thread(target=work, daemon=True)
+        self._refill.start()
+
+    def take(self, session: requests.Session) -> str:
+        """Pop the next start title, fetching synchronously only if the pool is empty."""
+        while True:
+            with self._lock:
+                title = None
+                while self._queue:
+                    t = self._queue.popleft()
+                    if _norm(t) not in self._excluded:
+                        title = t
+                        break
+                self._save()
+                if title is not None:
+                    break
+            if self._refill is not None and self._refill.is_alive():
+                self._refill.join()
+                continue
+            if self.fill(session) == 0:
+                raise RuntimeError("list=random returned no unvisited titles")
+        if len(self._queue) < self.low_water:
+            self._refill_in_background()
+        return title
+
+    def close(self) -> None:
+        """Wait for an in-flight refill so its batch is persisted."""
+        if self._refill is not None:
+            self._refill.join()
@@ -8,6 +8,7 @@ from typing import List
 
 from wikidata_html import steps_to_philosophy, title_of
 from wikidata_api import fetch_api_rows_for_titles
+from start_pool import StartPool, url_of
 
 WIKI_API = "https://en.wikipedia.org/w/api.php"
 
@@ -21,6 +22,9 @@ HYPERLINK_CSV = os.path.join(CSV_DIR, "hyperlink_data.csv")
 API_CSV = os.path.join(CSV_DIR, "api_data.csv")
 VISITED_TXT = os.path.join(LOG_DIR, "visited.txt")
 OUTPUT_TXT = os.path.join(LOG_DIR, "output.txt")
+START_POOL_TXT = os.path.join(LOG_DIR, "start_pool.txt")
+REVISIONS_CSV = os.path.join(LOG_DIR, "revisions.csv")
+GRAPH_BIN = os.path.join(DATA_DIR, "first_link_graph.bin")
 
 MAX_STEPS = 100
 DELAY = 0.5
@@ -84,8 +88,34 @@ def append_visited_titles(titles: List[str]):
             for t in new_titles:
                 f.write(t + "\n")
 
-def run_once(session: requests.Session, run_id: int, start_url: str | None = None):
-    result = steps_to_philosophy(session, run_id, DATA_DIR, start_url, MAX_STEPS, DELAY)
+def append_revisions(api_rows: List[dict]):
+    """
+    Record the revision each page was crawled at, so refresh.py only refetches later edits.
+    The revids come from the crawl's own prop=info rows; titles already stored at
+    the same revision are not appended again.
+    """
+    stored = {}
+    file_exists = os.path.exists(REVISIONS_CSV)
+    if file_exists:
+        with open(REVISIONS_CSV, "r", newline="", encoding="utf-8") as f:
+            stored = {row["page_title"]: row["lastrevid"] for row in csv.DictReader(f)}
+    new_rows = [[r["requested_title"], r["lastrevid"]] for r in api_rows
+                if r.get("lastrevid") is not None and stored.get(r["requested_title"]) != str(r["lastrevid"])]
+    if not new_rows:
+        return
+    with open(REVISIONS_CSV, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if not file_exists:
+            w.writerow(["page_title", "lastrevid"])
+        w.writerows(new_rows)
+
+def run_once(session: requests.Session, run_id: int, start_url: str | None = None,
+             pool: StartPool | None = None):
+    resolve_start = True
+    if start_url is None and pool is not None:
+        start_url = url_of(pool.take(session))
+        resolve_start = False
+    result = steps_to_philosophy(session, run_id, DATA_DIR, start_url, MAX_STEPS, DELAY, resolve_start)
     path_urls = result["path_urls"]
     stop_reason = result["stop_reason"]
 
@@ -96,6 +126,9 @@ def run_once(session: requests.Session, run_id: int, start_url: str | None = Non
     write_hyperlink_rows(path_urls, stop_reason, run_id)
     log_run(run_id, path_urls[0], stop_reason, path_urls)
     append_visited_titles(titles)
+    append_revisions(api_rows)
+    if pool is not None:
+        pool.exclude(titles)
 
 def next_run_id() -> int:
     if not os.path.exists(OUTPUT_TXT):
@@ -114,8 +147,11 @@ if __name__ == "__main__":
         sys.exit(1)
     runs = int(sys.argv[1])
     start = os.getenv("START_URL") or None
+    pool = None if start else StartPool(WIKI_API, START_POOL_TXT, VISITED_TXT, GRAPH_BIN)
     for _ in range(runs):
         run_id = next_run_id()
-        run_once(session, run_id, start)
+        run_once(session, run_id, start, pool)
         time.sleep(0.2)
-        append_text(OUTPUT_TXT, f"=== Finished Run: {run_id} ===\n")
\ No newline at end of file
+        append_text(OUTPUT_TXT, f"=== Finished Run: {run_id} ===\n")
+    if pool is not None:
+        pool.close()
\ No newline at end of file
@@ -2,10 +2,13 @@
 
 import os
 import time
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
+from urllib.parse import unquote
 import requests
 import re
 
+REVID_BATCH = 50  # titles per prop=info request for non-bot accounts
+
 def _get_page_url(title: str) -> str:
     return f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
 
@@ -81,7 +84,8 @@ def fetch_api_rows_for_titles(
     For each title not present in visited.txt:
       - Single-title query to get earliest revision timestamp, page length, pageviews
       - Count links with limited continuation
-    Returns list of dicts with keys: page_title, page_url, length_bytes, links_count, created_ts, views_30d, vital_level
+    Returns list of dicts with keys: page_title, page_url, length_bytes, links_count, created_ts, views_30d, vital_level,
+    plus lastrevid and requested_title (the title as passed in, before normalization)
     """
     visited = _load_visited_titles(visited_path)
     out: List[Dict] = []
@@ -126,6 +130,8 @@ def fetch_api_rows_for_titles(
                 "created_ts": None,
                 "views_30d": None,
                 "vital_level": None,
+                "lastrevid": None,
+                "requested_title": orig_title,
             })
             continue
 
@@ -172,8 +178,46 @@ def fetch_api_rows_for_titles(
             "created_ts": created_ts,
             "views_30d": views_30d,
             "vital_level": vital_level,
+            "lastrevid": page.get("lastrevid"),
+            "requested_title": orig_title,
         })
 
         time.sleep(0.1)
 
-    return out
\ No newline at end of file
+    return out
+
+def fetch_lastrevids(session: requests.Session, api: str, titles: List[str]) -> Dict[str, Optional[int]]:
+    """lastrevid for each title (as stored in the CSV), None if the page is gone."""
+    out: Dict[str, Optional[int]] = {}
+    for i in range(0, len(titles), REVID_BATCH):
+        batch = titles[i:i + REVID_BATCH]
+        clean: Dict[str, List[str]] = {}
+        for t in batch:
+            clean.setdefault(unquote(t), []).append(t)
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "info",
+            "titles": "|".join(clean),
+            "redirects": 1,
+        }
+        r = session.get(api, params=params, timeout=(5, 20))
+        r.raise_for_status()
+        q = r.json().get("query", {}) or {}
+
+        # Follow normalization and redirects back to every title we asked for;
+        # several (e.g. "Subregion" and "Subregion#Asia") can land on one page
+        back = {k: list(v) for k, v in clean.items()}
+        for key in ("normalized", "redirects"):
+            for m in q.get(key, []) or []:
+                if m.get("from") in back:
+                    back.setdefault(m["to"], []).extend(back[m["from"]])
+        for page in q.get("pages", []) or []:
+            revid = None if page.get("missing") else page.get("lastrevid")
+            for orig in back.get(page.get("title"), []):
+                out[orig] = revid
+        for t in batch:
+            out.setdefault(t, None)
+        time.sleep(0.1)
+    return out
@@ -9,6 +9,9 @@ RANDOM = "https://en.wikipedia.org/wiki/Special:Random"
 PHILOSOPHY = "https://en.wikipedia.org/wiki/Philosophy"
 PHILOSOPHICAL = "https://en.wikipedia.org/wiki/Philosophical"
 
+# Lowercased titles first_link never follows
+SKIP_TITLES = {"ancient greek"}
+
 def _norm_title_from_href(href: str) -> str:
     """Return a normalized page title extracted from a /wiki/... href.
     Lowercase, spaces, no fragment.
@@ -95,11 +98,15 @@ def _link_is_in_parentheses(p_tag, target_a) -> bool:
                         paren -= 1
     return False
 
-# function generated by ChatGPT
 def first_link(session: requests.Session, url: str) -> Optional[Tuple[str, str]]:
     r = session.get(url, allow_redirects=True, timeout=(5, 20))
     r.raise_for_status()
-    soup = BeautifulSoup(r.content, "html.parser")
+    return first_link_from_html(r.content)
+
+# function generated by ChatGPT
+def first_link_from_html(html: bytes) -> Optional[Tuple[str, str]]:
+    """Pick the first followable link (absolute URL, its sentence) from article HTML."""
+    soup = BeautifulSoup(html, "html.parser")
     content = soup.find("div", id="mw-content-text")
     if not content: return None
     for p in content.select("div.mw-parser-output > p"):
@@ -163,9 +170,12 @@ def first_link(session: requests.Session, url: str) -> Optional[Tuple[str, str]]
     return None
 
 def steps_to_philosophy(session: requests.Session, run_id: int, out_dir: str,
-                        start: Optional[str], max_steps: int, delay_s: float) -> Dict:
+                        start: Optional[str], max_steps: int, delay_s: float,
+                        resolve_start: bool = True) -> Dict:
+    # Starts drawn from list=random are already canonical, non-redirect titles
     url = start or session.get(RANDOM, allow_redirects=True, timeout=(5, 20)).url
-    url = resolve_redirects(session, url)
+    if resolve_start or not start:
+        url = resolve_redirects(session, url)
     seen = set()
     path_urls: List[str] = [url]
     link_sentences: List[str] = [""]